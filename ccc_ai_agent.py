@@ -3,14 +3,14 @@
 
 # In[ ]:
 
-import json
+import orjson
 import os
+from pathlib import Path
 
 # Load API keys from config.json
 try:
-    with open("config.json", "r") as config_file:
-        config = json.load(config_file)
-        os.environ["ANTHROPIC_API_KEY"] = config["ANTHROPIC_API_KEY"]
+    config = orjson.loads(Path("config.json").read_bytes())
+    os.environ["ANTHROPIC_API_KEY"] = config["ANTHROPIC_API_KEY"]
 except FileNotFoundError:
     print("Error: config.json file not found. Please create one with your API keys.")
     exit(1)
@@ -20,10 +20,9 @@ except KeyError as e:
 
 #Imports
 from typing import Literal, TypedDict
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_anthropic import ChatAnthropic
 from langchain_core.tools import tool
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph, MessagesState
 from langgraph.prebuilt import ToolNode
 from selenium import webdriver
@@ -33,181 +32,464 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from selenium.webdriver.edge.options import Options
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from urllib.parse import urljoin
 from PIL import Image
 from IPython.display import Image, display, HTML
 import logging
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pdfplumber
+from pdfminer.pdftypes import resolve1
+import fitz
+import traceback
+import time
 import io
+import hashlib
 import streamlit as st
 import base64
+import threading
+import asyncio
+import atexit
+from functools import lru_cache
+from cachetools import TTLCache
+
+# Shared HTTP session so repeated requests to the same host reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=3, backoff_factor=0.3)),
+)
+_HTTP_TIMEOUT = (5, 30)  # (connect, read) in seconds
 
-#TOOLS
-@tool
-def webstaurantstore(query: str = None, product_limit: int = 10) -> str:
+# Persistent Edge WebDriver, created lazily on first use and reused across tool calls
+_DRIVER = None
+_DRIVER_LOCK = threading.RLock()  # also held while a scrape uses the driver
+
+# Subresources the scraper never reads. Stylesheets are left alone because innerText depends on them.
+_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.webp", "*.gif", "*.svg", "*.woff", "*.woff2",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*facebook*",
+]
+
+def _get_driver():
     """
-    Scrapes the WebstaurantStore website for product data based on the search term with a user-defined product limit.
+    Returns the shared Edge WebDriver, installing and launching it on the first call.
+    """
+    global _DRIVER
+    with _DRIVER_LOCK:
+        if _DRIVER is None:
+            options = Options()
+            options.use_chromium = True
+            options.add_argument("--headless=new")
+            options.add_argument("--disable-dev-shm-usage")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            # Return from driver.get at DOMContentLoaded; WebDriverWait covers the product cards
+            options.page_load_strategy = "eager"
+            service = EdgeService(EdgeChromiumDriverManager().install())
+            driver = webdriver.Edge(service=service, options=options)
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+            except Exception:
+                # Don't orphan the browser that was just launched; the next call starts a fresh one
+                driver.quit()
+                raise
+            _DRIVER = driver
+            # Registered here rather than at import, since Streamlit re-executes the script on every rerun
+            atexit.register(_quit_driver)
+        return _DRIVER
+
+def _quit_driver():
+    """
+    Closes the shared Edge WebDriver, if one was started.
+    """
+    global _DRIVER
+    with _DRIVER_LOCK:
+        if _DRIVER is not None:
+            try:
+                _DRIVER.quit()
+                print("WebDriver closed successfully.")
+            except Exception as quit_exception:
+                print(f"Error closing WebDriver: {quit_exception}")
+            _DRIVER = None
 
-    Args:
-    - query (str): The search term used to find products. Default is None.
-    - product_limit (int): The maximum number of products to retrieve. Defaults to 10.
+# Successful tool results, keyed per tool on the normalized arguments and expired after an hour
+_TOOL_CACHE = TTLCache(maxsize=256, ttl=3600)
+_TOOL_CACHE_LOCK = threading.Lock()
+
+def _cache_get(key):
+    with _TOOL_CACHE_LOCK:
+        return _TOOL_CACHE.get(key)
+
+def _cache_set(key, value):
+    with _TOOL_CACHE_LOCK:
+        _TOOL_CACHE[key] = value
+
+#TOOLS
+# Browser-like User-Agent so WebstaurantStore serves the same markup it gives Edge
+_BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36 Edg/131.0.0.0"
+}
+
+def _parse_product_cards(html, url, product_limit):
+    """
+    Parses WebstaurantStore search-result markup into product dicts.
 
     Returns:
-    - str: A string representation of the products found, including price, URL, and description.
+    - list | None: The extracted products, or None if the page has no product containers.
     """
-    import traceback
-    import time 
+    tree = lxml_html.fromstring(html)
 
-    # Setup Edge WebDriver for Web Scraping
-    options = Options()
-    options.use_chromium = True
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    
-    try:
-        service = EdgeService(EdgeChromiumDriverManager().install())
-        driver = webdriver.Edge(service=service, options=options)
-    except Exception as e:
-        return f"Error initializing WebDriver: {e}"
+    product_nodes = tree.cssselect("div.product-box-container")
+    if not product_nodes:
+        return None
 
-    try:
-        if not query:
-            raise ValueError("Query term cannot be None or empty.")
+    products = []
+    for node in product_nodes:
+        description = node.cssselect('span[data-testid="itemDescription"]')
+        price = node.cssselect('[data-testid="price"]')
+        link = node.cssselect('a[data-testid="itemLink"]')
+        if not (description and price and link):
+            continue
 
-        url = f"https://www.webstaurantstore.com/search/{query.replace(' ', '-')}.html"
-        print(f"Navigating to URL: {url}")
-        driver.get(url)
+        products.append({
+            'description': " ".join(description[0].text_content().split()),
+            'price': " ".join(price[0].text_content().split()),
+            'product_link': urljoin(url, link[0].get('href', ''))
+        })
 
-        # Retry logic if elements are not loaded within 10 seconds
-        max_retries = 3
-        retry_count = 0
+        if len(products) >= product_limit:
+            break
 
-        while retry_count < max_retries:
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CLASS_NAME, 'product-box-container'))
-                )
-                break
-            except Exception as wait_exception:
-                retry_count += 1
-                print(f"Retry {retry_count}/{max_retries} due to timeout: {wait_exception}")
-                if retry_count >= max_retries:
-                    raise TimeoutError("Failed to load product elements after multiple retries.")
-                time.sleep(3)
-
-        # Extract product details
-        product_elements = driver.find_elements(By.CLASS_NAME, 'product-box-container')
-        products = []
-
-        for item in product_elements:
-            try:
-                description = item.find_element(By.CSS_SELECTOR, 'span[data-testid="itemDescription"]').text.strip()
-                price = item.find_element(By.CSS_SELECTOR, '[data-testid="price"]').text.strip()
-                product_link = item.find_element(By.CSS_SELECTOR, "a[data-testid='itemLink']").get_attribute('href')
+    return products
+
+def _scrape_webstaurantstore_html(url, product_limit):
+    """
+    Fetches the search page over plain HTTP and parses the server-rendered product cards.
 
-                products.append({
-                    'description': description,
-                    'price': price,
-                    'product_link': product_link
-                })
+    Returns:
+    - list | None: The extracted products, or None if the page has no product containers
+      (e.g. it was rendered client-side) and the WebDriver is needed instead.
+    """
+    response = _SESSION.get(url, headers=_BROWSER_HEADERS, timeout=_HTTP_TIMEOUT)
+    response.raise_for_status()
+    return _parse_product_cards(response.content, url, product_limit)
+
+# Runs in the browser and returns the first N complete product cards as a list of dicts
+_EXTRACT_PRODUCTS_JS = """
+return [...document.querySelectorAll('div.product-box-container')].map(el => ({
+    description: el.querySelector('span[data-testid="itemDescription"]')?.innerText.trim(),
+    price: el.querySelector('[data-testid="price"]')?.innerText.trim(),
+    product_link: el.querySelector('a[data-testid="itemLink"]')?.href
+})).filter(p => p.description && p.price && p.product_link).slice(0, arguments[0]);
+"""
 
-                if len(products) >= product_limit:
+def _scrape_webstaurantstore_selenium(url, product_limit):
+    """
+    Loads the search page in the shared Edge WebDriver and extracts the rendered product cards.
+
+    Returns:
+    - list: The extracted products. Raises if the WebDriver or the page fails.
+    """
+    # The browser is shared, so only one scrape may drive it at a time
+    with _DRIVER_LOCK:
+        try:
+            driver = _get_driver()
+        except Exception as e:
+            raise RuntimeError(f"Error initializing WebDriver: {e}") from e
+
+        try:
+            print(f"Navigating to URL: {url}")
+            driver.get(url)
+
+            # Retry logic if elements are not loaded within 10 seconds
+            max_retries = 3
+            retry_count = 0
+
+            while retry_count < max_retries:
+                try:
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_all_elements_located((By.CLASS_NAME, 'product-box-container'))
+                    )
                     break
-            except Exception as detail_exception:
-                print(f"Error extracting product details: {detail_exception}")
-                traceback.print_exc()
+                except Exception as wait_exception:
+                    retry_count += 1
+                    print(f"Retry {retry_count}/{max_retries} due to timeout: {wait_exception}")
+                    if retry_count >= max_retries:
+                        raise TimeoutError("Failed to load product elements after multiple retries.")
+                    time.sleep(3)
+
+            # Read every card in one script call instead of querying each one over WebDriver
+            return driver.execute_script(_EXTRACT_PRODUCTS_JS, product_limit)
+
+        except Exception as main_exception:
+            print(f"Error during scraping: {main_exception}")
+            traceback.print_exc()
+            # Keep the browser alive for the next call but drop any state left by the failed page
+            try:
+                driver.delete_all_cookies()
+            except Exception:
+                # The browser session itself is gone; start a fresh one next time
+                _quit_driver()
+            raise
 
-        if not products:
-            return "No products found. Please check the query or website structure."
 
-        return str(products)
+def _webstaurantstore(query, product_limit, force_refresh):
+    """
+    Blocking implementation of the `webstaurantstore` tool.
+    """
+    if not query:
+        return "Error during scraping: Query term cannot be None or empty."
+
+    cache_key = ("webstaurantstore", query.lower().strip(), product_limit)
+    if not force_refresh:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
 
-    except Exception as main_exception:
-        print(f"Error during scraping: {main_exception}")
-        traceback.print_exc()
-        return f"Error during scraping: {main_exception}"
+    url = f"https://www.webstaurantstore.com/search/{query.replace(' ', '-')}.html"
+
+    # Product cards are server-rendered, so try a plain HTTP fetch before starting a browser
+    try:
+        print(f"Fetching URL: {url}")
+        products = _scrape_webstaurantstore_html(url, product_limit)
+    except Exception as fetch_exception:
+        print(f"Direct fetch failed, falling back to WebDriver: {fetch_exception}")
+        products = None
 
-    finally:
+    if products is None:
         try:
-            driver.quit()
-            print("WebDriver closed successfully.")
-        except Exception as quit_exception:
-            print(f"Error closing WebDriver: {quit_exception}")
+            products = _scrape_webstaurantstore_selenium(url, product_limit)
+        except Exception as main_exception:
+            return f"Error during scraping: {main_exception}"
 
+    if not products:
+        return "No products found. Please check the query or website structure."
 
-@tool
-def icecastlefh(vehicle_name: str = None) -> str:
+    result = orjson.dumps(products).decode("utf-8")
+    _cache_set(cache_key, result)
+    return result
+
+
+# Patterns used by create_slug, compiled once
+_RX_DIM = re.compile(r"′\s*x\s*")
+_RX_SPACEX = re.compile(r'\s+x\s+')
+_RX_NON = re.compile(r'[^a-z0-9\-]')
+_RX_DUPDASH = re.compile(r'-{2,}')
+
+@lru_cache(maxsize=1024)
+def create_slug(product_name):
     """
-    Fetches standard options from IceCastleFH based on the provided vehicle name, attempts to match the closest product page,
-    and extracts floor plan information if available.
+    Converts a vehicle name into the URL-friendly slug used by icecastlefh.com product pages,
+    e.g. "6.5′ x 14′ Hunter's Haven" -> "6-5-x-14-hunters-haven".
+    """
+    product_name = product_name.lower()
+    product_name = product_name.replace('.', '-')
+    product_name = _RX_DIM.sub('-x-', product_name)
+    product_name = product_name.replace("'", '')
+    product_name = _RX_SPACEX.sub('x', product_name)
+    product_name = product_name.replace(' ', '-')
+    product_name = _RX_NON.sub('', product_name)
+    product_name = _RX_DUPDASH.sub('-', product_name)
+    return product_name.strip('-')
 
-    Args:
-    - vehicle_name (str): The name of the vehicle to search for. Default is None.
 
-    Returns:
-    - str: A string containing the extracted floor plan details along with the URL used to fetch the product information.
-            If an error occurs, an appropriate error message is returned.
+# Extracted floor-plan text, stored on disk with the PDF's ETag / Last-Modified validators
+_PDF_CACHE_DIR = Path(".pdf_cache")
+
+def _pdf_cache_path(pdf_url):
+    return _PDF_CACHE_DIR / f"{hashlib.sha256(pdf_url.encode('utf-8')).hexdigest()}.json"
+
+def _load_pdf_text(pdf_url):
+    """
+    Returns the cached entry for a PDF URL ({"etag", "last_modified", "text"}), or None.
+    """
+    try:
+        return orjson.loads(_pdf_cache_path(pdf_url).read_bytes())
+    except (OSError, ValueError):
+        return None
+
+def _store_pdf_text(pdf_url, headers, text):
     """
-    # Helper function to create a URL-friendly slug
-    def create_slug(product_name):
-        product_name = product_name.lower()
-        product_name = product_name.replace('.', '-')
-        product_name = re.sub(r"′\s*x\s*", '-x-', product_name)
-        product_name = product_name.replace("'", '')
-        product_name = re.sub(r'\s+x\s+', 'x', product_name)
-        product_name = product_name.replace(' ', '-')
-        product_name = re.sub(r'[^a-z0-9\-]', '', product_name)
-        roduct_name = re.sub(r'-{2,}', '-', product_name)
-        return product_name.strip('-')
+    Caches the extracted text of a PDF, provided the server sent validators to revalidate it with later.
+    """
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if not (etag or last_modified):
+        return
+
+    try:
+        _PDF_CACHE_DIR.mkdir(exist_ok=True)
+        path = _pdf_cache_path(pdf_url)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(orjson.dumps({"etag": etag, "last_modified": last_modified, "text": text}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not cache PDF text: {e}")
+
+
+def extract_pdf_text(pdf_file):
+    """
+    Extracts the text of every page in an in-memory PDF (io.BytesIO) using PyMuPDF, falling back to pdfplumber
+    for files PyMuPDF cannot open. Pages that carry no text (no fonts / no chars, e.g. floor-plan drawings) are skipped
+    before text extraction. Per-page content bytes in / chars out are logged at debug level to
+    spot pages that decode a lot of content for little text.
+    """
+    log_stats = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    try:
+        with fitz.open(stream=pdf_file, filetype="pdf") as doc:
+            page_texts = []
+            for page in doc:
+                if not page.get_fonts():
+                    # Pages are logged 1-based in both paths, matching pdfplumber's page_number
+                    logging.debug("Skipping page %d: no fonts", page.number + 1)
+                    continue
+                text = page.get_text("text")
+                if log_stats:
+                    logging.debug("Page %d: %d content bytes in, %d chars out",
+                                  page.number + 1, len(page.read_contents()), len(text))
+                page_texts.append(text)
+            return "\n\n".join(page_texts)
+    except fitz.FileDataError as e:
+        print(f"PyMuPDF could not open the PDF, falling back to pdfplumber: {e}")
+
+    pdf_file.seek(0)
+    with pdfplumber.open(pdf_file) as pdf:
+        page_texts = []
+        for page in pdf.pages:
+            # page.chars also covers text drawn through Form XObjects, and extract_text reuses the parsed chars
+            if not page.chars[:1]:
+                logging.debug("Skipping page %d: no text", page.page_number)
+                continue
+            text = page.extract_text() or ""
+            if log_stats:
+                # A /Contents array keeps its streams as indirect references, so resolve each one first
+                logging.debug("Page %d: %d content bytes in, %d chars out", page.page_number,
+                              sum(len(resolve1(stream).get_data()) for stream in page.page_obj.contents), len(text))
+            page_texts.append(text)
+        return "\n\n".join(page_texts)
+
+
+def _icecastlefh(vehicle_name, force_refresh):
+    """
+    Blocking implementation of the `icecastlefh` tool.
+    """
+    if not vehicle_name:
+        return "Error fetching data: Vehicle name cannot be None or empty."
+
+    # Step 1: Create product slug
+    slug = create_slug(vehicle_name)
+    cache_key = ("icecastlefh", slug)
+    if not force_refresh:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
 
     try:
-        # Step 1: Create product slug
-        slug = create_slug(vehicle_name)
         product_url = f"https://icecastlefh.com/product/{slug}"
         print(f"Fetching data from: {product_url}")
 
         # Step 2: Fetch product page
-        response = requests.get(product_url)
+        response = _SESSION.get(product_url, timeout=_HTTP_TIMEOUT)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        tree = lxml_html.fromstring(response.content)
 
         # Step 3: Find the PDF link
-        pdf_link_tag = soup.find('a', href=lambda href: href and '/wp-content/uploads/' in href, 
-                                 string=lambda text: text and 'Floor Plan' in text)
+        pdf_links = tree.xpath("//a[contains(@href, '/wp-content/uploads/') and contains(., 'Floor Plan')]")
         
-        if not pdf_link_tag or 'href' not in pdf_link_tag.attrs:
+        if not pdf_links:
             return f"PDF link not found on the product page. URL: {product_url}"
 
-        href = pdf_link_tag['href']
+        href = pdf_links[0].get('href')
         pdf_url = href if href.startswith("http") else f"https://icecastlefh.com{href}"
         print(f"PDF URL found: {pdf_url}")
 
-        # Step 4: Fetch PDF content
-        pdf_response = requests.get(pdf_url)
-        pdf_response.raise_for_status()
+        # Step 4: Revalidate any previously extracted text with a conditional request
+        cached_pdf = None if force_refresh else _load_pdf_text(pdf_url)
+        headers = {}
+        if cached_pdf:
+            if cached_pdf.get("etag"):
+                headers["If-None-Match"] = cached_pdf["etag"]
+            if cached_pdf.get("last_modified"):
+                headers["If-Modified-Since"] = cached_pdf["last_modified"]
+
+        with _SESSION.get(pdf_url, headers=headers, stream=True, timeout=_HTTP_TIMEOUT) as pdf_response:
+            if cached_pdf and pdf_response.status_code == 304:
+                print("PDF not modified, using cached text.")
+                full_text = cached_pdf["text"]
+            else:
+                pdf_response.raise_for_status()
+
+                # Stream the PDF into a single in-memory buffer. PyMuPDF parses from memory,
+                # so spooling to disk would only add a copy back into bytes.
+                pdf_file = io.BytesIO()
+                for chunk in pdf_response.iter_content(chunk_size=64 * 1024):
+                    pdf_file.write(chunk)
+                logging.debug("Downloaded %d bytes from %s", pdf_file.tell(), pdf_url)
+                pdf_file.seek(0)
 
-        # Step 5: Extract text from PDF
-        with pdfplumber.open(io.BytesIO(pdf_response.content)) as pdf:
-            full_text = ""
-            for page in pdf.pages:
-                full_text += page.extract_text() + "\n\n"
+                # Step 5: Extract text from PDF
+                full_text = extract_pdf_text(pdf_file)
 
-        return f"Product URL: {product_url}\n\n{full_text.strip() if full_text.strip() else 'No text found in the PDF.'}"
+                _store_pdf_text(pdf_url, pdf_response.headers, full_text)
+
+        result = f"Product URL: {product_url}\n\n{full_text.strip() if full_text.strip() else 'No text found in the PDF.'}"
+        _cache_set(cache_key, result)
+        return result
 
     except requests.exceptions.RequestException as e:
         return f"Error fetching data: {e}\nURL: {product_url}"
     except Exception as e:
         return f"An unexpected error occurred: {e}\nURL: {product_url}"
 
+
+# The tools are async so that LangGraph can await several tool calls from one turn together;
+# the blocking scrape/download work runs in worker threads
+@tool
+async def webstaurantstore(query: str = None, product_limit: int = 10, force_refresh: bool = False) -> str:
+    """
+    Scrapes the WebstaurantStore website for product data based on the search term with a user-defined product limit.
+
+    Args:
+    - query (str): The search term used to find products. Default is None.
+    - product_limit (int): The maximum number of products to retrieve. Defaults to 10.
+    - force_refresh (bool): Skip the cached result and scrape the website again. Defaults to False.
+
+    Returns:
+    - str: A JSON array of the products found, including price, URL, and description.
+    """
+    return await asyncio.to_thread(_webstaurantstore, query, product_limit, force_refresh)
+
+
+@tool
+async def icecastlefh(vehicle_name: str = None, force_refresh: bool = False) -> str:
+    """
+    Fetches standard options from IceCastleFH based on the provided vehicle name, attempts to match the closest product page,
+    and extracts floor plan information if available.
+
+    Args:
+    - vehicle_name (str): The name of the vehicle to search for. Default is None.
+    - force_refresh (bool): Skip the cached result and fetch the product page and PDF again. Defaults to False.
+
+    Returns:
+    - str: A string containing the extracted floor plan details along with the URL used to fetch the product information.
+            If an error occurs, an appropriate error message is returned.
+    """
+    return await asyncio.to_thread(_icecastlefh, vehicle_name, force_refresh)
+
  
 tools = [webstaurantstore, icecastlefh]
 
-tool_node = ToolNode(tools)
-
-# Initialize model
-model = ChatAnthropic(model="claude-3-5-sonnet-20240620", temperature=0).bind_tools(tools)
+# Initialize model, cached so the Anthropic client and its connection pool are reused across reruns
+@st.cache_resource
+def get_model():
+    return ChatAnthropic(model="claude-3-5-sonnet-20240620", temperature=0).bind_tools(tools)
 
 # Define the function that determines whether to continue or not
 def should_continue(state: MessagesState) -> Literal["tools", END]:
@@ -217,12 +499,8 @@ def should_continue(state: MessagesState) -> Literal["tools", END]:
         return "tools"
     return END
 
-# Define the function that calls the model
-def call_model(state: MessagesState):
-    """
-    Ensures the LLM always adheres to the format by using a system message.
-    """
-    system_message = """ 
+# System prompt that keeps the LLM to the expected output format
+SYSTEM_MESSAGE = """ 
 You are a helpful assistant that only provides factual product information. 
 Do not include any opinions, summaries, or extra commentary. 
 Always present product data in a well-formatted table, regardless of the number of products returned, even if it's just one product.
@@ -245,39 +523,105 @@ Instructions:
 
  
 """
+
+# Kept byte-identical across calls and marked cacheable so Anthropic reuses the tools + system prefix
+_SYSTEM_PROMPT = SystemMessage(content=[
+    {"type": "text", "text": SYSTEM_MESSAGE, "cache_control": {"type": "ephemeral"}}
+])
+
+# Final answers keyed on the normalized user query, so rephrasings of the same question skip the LLM
+_RESPONSE_CACHE = TTLCache(maxsize=256, ttl=3600)
+_RESPONSE_CACHE_LOCK = threading.Lock()
+# Tool results starting with these are failures, which the tools themselves never cache either
+_TOOL_ERROR_PREFIXES = (
+    "Error during scraping:", "Error fetching data:", "An unexpected error occurred:",
+    "PDF link not found", "No products found",
+)
+_NUMBER_WORDS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+}
+
+def normalize_query(text):
+    """
+    Reduces a user query to a canonical form, e.g. "Top three 2-compartment sinks?" -> "top 3 2 compartment sinks".
+    Words in any script and symbols such as < > $ are kept; only separator punctuation is dropped.
+    """
+    tokens = re.findall(r"\d+(?:\.\d+)?|\w+|[^\w\s\-–—?!.,;:'’\"“”()]", text.lower())
+    return " ".join(_NUMBER_WORDS.get(token, token) for token in tokens)
+
+def _has_tool_error(messages):
+    """
+    Returns True if any tool result in the given messages reports a failure.
+    """
+    return any(
+        isinstance(m, ToolMessage)
+        and (m.status == "error" or str(m.content).startswith(_TOOL_ERROR_PREFIXES))
+        for m in messages
+    )
+
+# Define the function that calls the model
+def call_model(state: MessagesState, model):
+    """
+    Ensures the LLM always adheres to the format by using a system message.
+    """
+    # Only a fresh user turn can be answered from the cache; tool results must always reach the model
+    last_message = state['messages'][-1]
+    cache_key = normalize_query(last_message.content) if isinstance(last_message, HumanMessage) else ""
+    if cache_key:
+        with _RESPONSE_CACHE_LOCK:
+            cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return {"messages": [AIMessage(content=cached)]}
+
     # Prepend the system message
-    messages = [HumanMessage(role="system", content=system_message)] + state['messages']
+    messages = [_SYSTEM_PROMPT] + state['messages']
     
     response = model.invoke(messages)
+
+    # Remember the final answer against the user query that started this turn, unless a tool failed along the way
+    if not response.tool_calls:
+        history = state['messages']
+        user_index = next((i for i in reversed(range(len(history))) if isinstance(history[i], HumanMessage)), None)
+        cache_key = normalize_query(history[user_index].content) if user_index is not None else ""
+        # An empty key means the query had nothing comparable in it, so it must not share an entry
+        if cache_key and not _has_tool_error(history[user_index + 1:]):
+            with _RESPONSE_CACHE_LOCK:
+                _RESPONSE_CACHE[cache_key] = response.content
     
     return {"messages": [response]}
 
-# Define the workflow graph
-workflow = StateGraph(MessagesState)
+# Build and compile the workflow graph once per process; Streamlit re-executes this script on every rerun
+@st.cache_resource
+def get_app():
+    model = get_model()
+    tool_node = ToolNode(tools)
+
+    # Define the workflow graph
+    workflow = StateGraph(MessagesState)
 
-#Nodes
-workflow.add_node("agent", call_model)
-workflow.add_node("tools", tool_node)
+    #Nodes
+    workflow.add_node("agent", lambda state: call_model(state, model))
+    workflow.add_node("tools", tool_node)
 
-#Edges
-workflow.add_edge(START, "agent")
-workflow.add_conditional_edges("agent", should_continue)
-workflow.add_edge("tools", "agent")
+    #Edges
+    workflow.add_edge(START, "agent")
+    workflow.add_conditional_edges("agent", should_continue)
+    workflow.add_edge("tools", "agent")
 
-# Initialize memory to persist state
-checkpointer = MemorySaver()
+    # Compiling Graph. No checkpointer: every query is a one-off conversation, and a process-wide
+    # checkpointer would keep every query's messages in memory until the server restarts.
+    return workflow.compile()
 
-# Compiling Graph
-app = workflow.compile(checkpointer=checkpointer)
+app = get_app()
 
-# Function to convert images to Base64
+# Function to convert images to Base64, cached so the logos are only read and encoded once per process
+@st.cache_resource
 def image_to_base64(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode("utf-8")
+    return base64.b64encode(Path(image_path).read_bytes()).decode("utf-8")
 
 # Custom CSS for styling
-st.markdown(
-    """
+_CSS = """
     <style>
         /* Set the main page background to white */
         body, .stApp {
@@ -332,20 +676,14 @@ st.markdown(
             background-color: #444; /* Dark gray on hover */
         }
     </style>
-    """,
-    unsafe_allow_html=True
-)
-
-def run_chatbot_streamlit():
-    # Initialize state for the current chat
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    """
 
-    # Title and Logos
+# Title and Logos, built once per process
+@st.cache_resource
+def header_html():
     uic_logo_base64 = image_to_base64("uic_logo.png")
     ccc_logo_base64 = image_to_base64("ccc_logo.png")
-    st.markdown(
-        f"""
+    return f"""
         <div class="logo-title-container">
             <img src="data:image/png;base64,{uic_logo_base64}" class="logo">
             <div>
@@ -354,9 +692,17 @@ def run_chatbot_streamlit():
             </div>
             <img src="data:image/png;base64,{ccc_logo_base64}" class="logo">
         </div>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+def run_chatbot_streamlit():
+    # Initialize state for the current chat
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+    # Title and Logos
+    st.markdown(header_html(), unsafe_allow_html=True)
 
     # Current Chat Input
     user_input = st.text_input("You:", key="input", placeholder="Type your query here...")
@@ -373,10 +719,9 @@ def run_chatbot_streamlit():
         st.session_state.messages.append({"role": "user", "content": user_input})
         try:
             st.write("Processing user input...")
-            final_state = app.invoke(
-                {"messages": [HumanMessage(content=user_input)]},
-                config={"configurable": {"thread_id": 42}}
-            )
+            final_state = asyncio.run(app.ainvoke(
+                {"messages": [HumanMessage(content=user_input)]}
+            ))
             st.write("Response received!")
             response = final_state["messages"][-1].content
             st.session_state.messages.append({"role": "assistant", "content": response})